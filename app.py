@@ -3,37 +3,80 @@
 Todo API - A simple Flask REST API for managing todos
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
-from datetime import datetime
+from werkzeug.exceptions import HTTPException
+from datetime import datetime, timedelta
+from functools import lru_cache
+import orjson
+import threading
+import time
 import uuid
 import os
 
 app = Flask(__name__)
-CORS(app)
+# Match '/todos/' as well as '/todos' instead of answering with a redirect or 404
+app.url_map.strict_slashes = False
+# Only the API needs CORS; let browsers cache preflight responses for a day
+cors_origins = [origin.strip() for origin in os.environ.get('CORS_ORIGINS', '*').split(',') if origin.strip()]
+CORS(app, resources={r"/api/v1/*": {"origins": cors_origins}}, max_age=86400)
 
-# In-memory storage for todos
-todos = []
+# In-memory storage for todos, keyed by ID (dicts keep insertion order)
+todos = {}
+# Number of completed todos, kept in sync on every mutation
+completed_count = 0
+# Encoded GET /api/v1/todos bodies per filter, cleared whenever todos change
+todos_response_cache = {}
+# Guards todos, completed_count, todo dict caches and todos_response_cache
+todos_lock = threading.Lock()
+
+EPOCH = datetime(1970, 1, 1)
+
+def now_iso():
+    """Current UTC time as an ISO 8601 string"""
+    return datetime.utcnow().isoformat()
+
+def now_us():
+    """Current UTC time as integer microseconds since the epoch"""
+    return time.time_ns() // 1000
+
+@lru_cache(maxsize=4096)
+def format_timestamp(timestamp_us):
+    """Format epoch microseconds as an ISO 8601 string, like now_iso()"""
+    return (EPOCH + timedelta(microseconds=timestamp_us)).isoformat()
 
 class Todo:
     """Todo model"""
+    __slots__ = ('id', 'title', 'description', 'completed', 'created_at_us', 'updated_at_us', '_dict_cache', '_json_cache')
+    
     def __init__(self, title, description=""):
-        self.id = str(uuid.uuid4())
+        self.id = uuid.uuid4().hex
         self.title = title
         self.description = description
         self.completed = False
-        self.created_at = datetime.utcnow().isoformat()
-        self.updated_at = datetime.utcnow().isoformat()
+        # Timestamps are kept as integers and only formatted for output
+        self.created_at_us = self.updated_at_us = now_us()
+        self._dict_cache = None
+        self._json_cache = None
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'completed': self.completed,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at
-        }
+        # Built once per change; update() drops the cached copy
+        if self._dict_cache is None:
+            self._dict_cache = {
+                'id': self.id,
+                'title': self.title,
+                'description': self.description,
+                'completed': self.completed,
+                'created_at': format_timestamp(self.created_at_us),
+                'updated_at': format_timestamp(self.updated_at_us)
+            }
+        return self._dict_cache
+    
+    def to_json(self):
+        """Encoded to_dict(), cached like the dict itself"""
+        if self._json_cache is None:
+            self._json_cache = orjson.dumps(self.to_dict())
+        return self._json_cache
     
     def update(self, title=None, description=None, completed=None):
         if title is not None:
@@ -42,14 +85,23 @@ class Todo:
             self.description = description
         if completed is not None:
             self.completed = completed
-        self.updated_at = datetime.utcnow().isoformat()
+        self.updated_at_us = now_us()
+        self._dict_cache = None
+        self._json_cache = None
+
+def json_response(payload, status_code=200):
+    """Serialize payload with orjson into a JSON response"""
+    return Response(orjson.dumps(payload), status=status_code, mimetype='application/json')
 
 def find_todo_by_id(todo_id):
     """Find todo by ID"""
-    for todo in todos:
-        if todo.id == todo_id:
-            return todo
-    return None
+    return todos.get(todo_id)
+
+def track_completion(was_completed, is_completed):
+    """Keep completed_count in sync when a todo changes completion status"""
+    global completed_count
+    if is_completed != was_completed:
+        completed_count += 1 if is_completed else -1
 
 def validate_todo_data(data, required_fields=None):
     """Validate todo data"""
@@ -62,9 +114,11 @@ def validate_todo_data(data, required_fields=None):
                 return f"Field '{field}' is required"
     
     if 'title' in data:
-        if not isinstance(data['title'], str) or len(data['title'].strip()) == 0:
+        title = data['title']
+        # isspace() avoids building a stripped copy just to test for emptiness
+        if not isinstance(title, str) or not title or title.isspace():
             return "Title must be a non-empty string"
-        if len(data['title']) > 200:
+        if len(title) > 200:
             return "Title cannot exceed 200 characters"
     
     if 'description' in data:
@@ -79,212 +133,209 @@ def validate_todo_data(data, required_fields=None):
     
     return None
 
+class APIError(Exception):
+    """Error rendered as a JSON error response by the app's error handlers"""
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def read_json():
+    """Parse the JSON request body with orjson"""
+    if not request.is_json:
+        raise APIError("Content-Type must be application/json", 415)
+    try:
+        return orjson.loads(request.get_data(cache=False) or b'null')
+    except orjson.JSONDecodeError:
+        raise APIError("Request body must be valid JSON", 400)
+
+def error_response(message, status_code):
+    """Build the standard JSON error response"""
+    return json_response({
+        'success': False,
+        'error': {'message': message, 'status_code': status_code}
+    }, status_code)
+
+@app.errorhandler(APIError)
+def handle_api_error(e):
+    """Render errors raised by the views"""
+    return error_response(e.message, e.status_code)
+
+@app.errorhandler(HTTPException)
+def handle_http_error(e):
+    """Render werkzeug HTTP errors (bad JSON, unknown routes) as JSON"""
+    response = error_response(e.description, e.code)
+    # Keep headers the exception supplies, such as Allow on a 405
+    response.headers.extend((k, v) for k, v in e.get_headers() if k.lower() != 'content-type')
+    return response
+
+@app.errorhandler(Exception)
+def handle_unexpected_error(e):
+    """Render any other exception as a 500 error"""
+    return error_response(str(e), 500)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'message': 'Todo API is running',
-        'timestamp': datetime.utcnow().isoformat()
-    }), 200
+        'timestamp': now_iso()
+    }, 200)
 
 @app.route('/api/v1/todos', methods=['GET'])
 def get_todos():
     """Get all todos with optional filtering"""
-    try:
-        filter_param = request.args.get('filter', 'all').lower()
-        
-        if filter_param == 'completed':
-            filtered_todos = [todo for todo in todos if todo.completed]
-        elif filter_param == 'pending':
-            filtered_todos = [todo for todo in todos if not todo.completed]
-        else:
-            filtered_todos = todos
-        
-        return jsonify({
-            'success': True,
-            'data': [todo.to_dict() for todo in filtered_todos],
-            'count': len(filtered_todos)
-        }), 200
+    filter_param = request.args.get('filter', 'all').lower()
+    if filter_param not in ('completed', 'pending'):
+        filter_param = 'all'
+    
+    with todos_lock:
+        body = todos_response_cache.get(filter_param)
+        if body is None:
+            # Skip the scan entirely when the requested bucket is empty
+            if filter_param == 'completed':
+                filtered_todos = [todo for todo in todos.values() if todo.completed] if completed_count else []
+            elif filter_param == 'pending':
+                filtered_todos = [todo for todo in todos.values() if not todo.completed] if completed_count < len(todos) else []
+            else:
+                filtered_todos = list(todos.values())
+            
+            # Splice the per-todo encodings together so unchanged todos are not re-encoded
+            body = todos_response_cache[filter_param] = b''.join((
+                b'{"success":true,"data":[',
+                b','.join([todo.to_json() for todo in filtered_todos]),
+                b'],"count":%d}' % len(filtered_todos)
+            ))
     
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': {'message': str(e), 'status_code': 500}
-        }), 500
+    return Response(body, status=200, mimetype='application/json')
 
 @app.route('/api/v1/todos', methods=['POST'])
 def create_todo():
     """Create a new todo"""
-    try:
-        data = request.get_json()
-        
-        # Validate input
-        error = validate_todo_data(data, required_fields=['title'])
-        if error:
-            return jsonify({
-                'success': False,
-                'error': {'message': error, 'status_code': 400}
-            }), 400
-        
-        # Create todo
-        todo = Todo(
-            title=data['title'],
-            description=data.get('description', '')
-        )
-        todos.append(todo)
-        
-        return jsonify({
-            'success': True,
-            'message': 'Todo created successfully',
-            'data': todo.to_dict()
-        }), 201
+    data = read_json()
+    
+    # Validate input
+    error = validate_todo_data(data, required_fields=['title'])
+    if error:
+        raise APIError(error, 400)
+    
+    # Create todo
+    todo = Todo(
+        title=data['title'],
+        description=data.get('description', '')
+    )
+    with todos_lock:
+        todos[todo.id] = todo
+        todos_response_cache.clear()
+        todo_dict = todo.to_dict()
     
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': {'message': str(e), 'status_code': 500}
-        }), 500
+    return json_response({
+        'success': True,
+        'message': 'Todo created successfully',
+        'data': todo_dict
+    }, 201)
 
 @app.route('/api/v1/todos/<todo_id>', methods=['GET'])
 def get_todo(todo_id):
     """Get a specific todo by ID"""
-    try:
+    with todos_lock:
         todo = find_todo_by_id(todo_id)
-        
         if not todo:
-            return jsonify({
-                'success': False,
-                'error': {'message': 'Todo not found', 'status_code': 404}
-            }), 404
-        
-        return jsonify({
-            'success': True,
-            'data': todo.to_dict()
-        }), 200
+            raise APIError('Todo not found', 404)
+        todo_dict = todo.to_dict()
     
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': {'message': str(e), 'status_code': 500}
-        }), 500
+    return json_response({
+        'success': True,
+        'data': todo_dict
+    }, 200)
 
 @app.route('/api/v1/todos/<todo_id>', methods=['PUT'])
 def update_todo(todo_id):
     """Update a specific todo"""
-    try:
-        data = request.get_json()
-        
-        # Validate input
-        error = validate_todo_data(data)
-        if error:
-            return jsonify({
-                'success': False,
-                'error': {'message': error, 'status_code': 400}
-            }), 400
-        
+    data = read_json()
+    
+    # Validate input
+    error = validate_todo_data(data)
+    if error:
+        raise APIError(error, 400)
+    
+    with todos_lock:
         todo = find_todo_by_id(todo_id)
         if not todo:
-            return jsonify({
-                'success': False,
-                'error': {'message': 'Todo not found', 'status_code': 404}
-            }), 404
+            raise APIError('Todo not found', 404)
         
         # Update todo
+        was_completed = todo.completed
         todo.update(
             title=data.get('title'),
             description=data.get('description'),
             completed=data.get('completed')
         )
-        
-        return jsonify({
-            'success': True,
-            'message': 'Todo updated successfully',
-            'data': todo.to_dict()
-        }), 200
+        track_completion(was_completed, todo.completed)
+        todos_response_cache.clear()
+        todo_dict = todo.to_dict()
     
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': {'message': str(e), 'status_code': 500}
-        }), 500
+    return json_response({
+        'success': True,
+        'message': 'Todo updated successfully',
+        'data': todo_dict
+    }, 200)
 
 @app.route('/api/v1/todos/<todo_id>', methods=['DELETE'])
 def delete_todo(todo_id):
     """Delete a specific todo"""
-    try:
-        todo = find_todo_by_id(todo_id)
-        
+    with todos_lock:
+        todo = todos.pop(todo_id, None)
         if not todo:
-            return jsonify({
-                'success': False,
-                'error': {'message': 'Todo not found', 'status_code': 404}
-            }), 404
-        
-        todos.remove(todo)
-        
-        return jsonify({
-            'success': True,
-            'message': 'Todo deleted successfully'
-        }), 200
+            raise APIError('Todo not found', 404)
+        track_completion(todo.completed, False)
+        todos_response_cache.clear()
     
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': {'message': str(e), 'status_code': 500}
-        }), 500
+    return json_response({
+        'success': True,
+        'message': 'Todo deleted successfully'
+    }, 200)
 
 @app.route('/api/v1/todos/<todo_id>/toggle', methods=['PATCH'])
 def toggle_todo(todo_id):
     """Toggle todo completion status"""
-    try:
+    with todos_lock:
         todo = find_todo_by_id(todo_id)
-        
         if not todo:
-            return jsonify({
-                'success': False,
-                'error': {'message': 'Todo not found', 'status_code': 404}
-            }), 404
+            raise APIError('Todo not found', 404)
         
         # Toggle completion status
+        was_completed = todo.completed
         todo.update(completed=not todo.completed)
-        
-        return jsonify({
-            'success': True,
-            'message': f'Todo marked as {"completed" if todo.completed else "pending"}',
-            'data': todo.to_dict()
-        }), 200
+        track_completion(was_completed, todo.completed)
+        todos_response_cache.clear()
+        todo_dict = todo.to_dict()
     
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': {'message': str(e), 'status_code': 500}
-        }), 500
+    return json_response({
+        'success': True,
+        'message': f'Todo marked as {"completed" if todo_dict["completed"] else "pending"}',
+        'data': todo_dict
+    }, 200)
 
 @app.route('/api/v1/todos/stats', methods=['GET'])
 def get_todo_stats():
     """Get todo statistics"""
-    try:
+    with todos_lock:
         total = len(todos)
-        completed = len([todo for todo in todos if todo.completed])
-        pending = total - completed
-        completion_rate = round((completed / total) * 100, 2) if total > 0 else 0
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'total': total,
-                'completed': completed,
-                'pending': pending,
-                'completion_rate': completion_rate
-            }
-        }), 200
+        completed = completed_count
+    pending = total - completed
+    completion_rate = round((completed / total) * 100, 2) if total > 0 else 0
     
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': {'message': str(e), 'status_code': 500}
-        }), 500
+    return json_response({
+        'success': True,
+        'data': {
+            'total': total,
+            'completed': completed,
+            'pending': pending,
+            'completion_rate': completion_rate
+        }
+    }, 200)
 
 if __name__ == '__main__':
     # Get configuration from environment variables